@@ -20,8 +20,12 @@ dependencies:
 with open('_jl/environment.yml', 'w') as f:
     f.write(lab_environment)
 
+# guide-nb.ipynb is generated and validated by guide-nb.py, so use the v4
+# reader and writer directly to skip the validation nbformat.read and
+# nbformat.write would otherwise do; set FACTORIOCALC_VALIDATE_NB to
+# validate anyway
 with open('docs/guide-nb.ipynb') as f:
-    nb = nbformat.read(f, 4)
+    nb = nbformat.v4.reads(f.read())
 
 nb.metadata.kernelspec = {
     'name': 'xeus-python',
@@ -46,5 +50,9 @@ for cell in nb.cells:
     
 nb.cells = cells
 
+if os.environ.get('FACTORIOCALC_VALIDATE_NB'):
+    nbformat.validate(nb)
+
 with open(f'_jl/files/guide-{factoriocalc.__version__}.ipynb', 'w') as f:
-    nbformat.write(nb, f)
+    f.write(nbformat.v4.writes(nb))
+    f.write('\n')
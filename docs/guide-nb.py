@@ -2,6 +2,7 @@ import re
 import sys
 import os
 import base64
+import mmap
 from pathlib import Path
 
 import nbformat
@@ -12,32 +13,53 @@ import factoriocalc
 
 readthedocs_version = os.environ.get('READTHEDOCS_VERSION', 'devel')
 
+RE_FRONT_MATTER = re.compile(r'^---\n')
+RE_EVAL_RST = re.compile(r'```\{eval-rst\}.+?\n```', re.DOTALL)
+RE_TILDE_REF = re.compile(r'(?<!\`)`~.+?\.([^`.]+)\`')
+RE_REF_LINK = re.compile(r'\[(.+?)\]\(reference\.rst(.*?)\)')
+RE_HEADING = re.compile(r'(\(.+?\)=\n)?\#.+')
+RE_TARGET = re.compile(r'^\((.+)\)\=', re.MULTILINE)
+RE_IMG = re.compile(r'\!\[(.+?)\]\((.+?)\)')
+
 with open('guide0.md', 'r') as f:
     text = f.read()
 
-text,n = re.subn(r'^---\n', '---\n# automatically generated file edit guide0.md instead\n', text)
+text,n = RE_FRONT_MATTER.subn('---\n# automatically generated file edit guide0.md instead\n', text)
 if n != 1:
     raise RuntimeError("guide0.md does not start with '---'")
 
 # remove any eval-rst directoves
-text = re.sub(r'```\{eval-rst\}.+?\n```', r'', text, flags = re.DOTALL)
+text = RE_EVAL_RST.sub(r'', text)
 
 # `~package.symbol` => `symbol`
-text = re.sub(r'(?<!\`)`~.+?\.([^`.]+)\`', r'`\g<1>`', text)
+text = RE_TILDE_REF.sub(r'`\g<1>`', text)
 
 baseUrl = f'https://factoriocalc.readthedocs.io/en/{readthedocs_version}'
 referenceUrl = f'{baseUrl}/reference.html'
-text = re.sub(r'\[(.+?)\]\(reference\.rst(.*?)\)', f'[\g<1>]({referenceUrl}\g<2>)', text)
-
-# pad all headings with '+++' so that they are in there own markdown cell
-text = re.sub(r'\n\n(\(.+?\)=\n)?(\#.+)\n\n','\n\n+++\n\n\g<1>\g<2>\n\n+++\n\n', text)
-n = 1
-while n > 0:
-    text,n = re.subn(r'\+\+\+\n\n(\(.+?\)=\n)?(\#.+)\n\n(?!\+\+\+)','+++\n\n\g<1>\g<2>\n\n+++\n\n', text)
+text = RE_REF_LINK.sub(f'[\g<1>]({referenceUrl}\g<2>)', text)
+
+# pad all headings with '+++' so that they are in there own markdown cell,
+# consecutive headings share a single '+++' between them
+paras = text.split('\n\n')
+out = [paras[0]]
+padded = False
+for para in paras[1:-1]:
+    if RE_HEADING.fullmatch(para):
+        if not padded:
+            out.append('+++')
+        out.append(para)
+        out.append('+++')
+        padded = True
+    else:
+        out.append(para)
+        padded = False
+if len(paras) > 1:
+    out.append(paras[-1])
+text = '\n\n'.join(out)
 
 
 # (target)= => <a name="target"></a>
-text = re.sub(r'^\((.+)\)\=', '<a name="\g<1>"></a>', text, flags = re.MULTILINE)
+text = RE_TARGET.sub('<a name="\g<1>"></a>', text)
 
 # convert myst markdown file to notebook
 
@@ -53,6 +75,19 @@ install it:
 
 intro_p2_code = f"#%pip install factoriocalc=={factoriocalc.__version__}"
 
+# inline images, map the file rather than reading it into a temporary
+# buffer before encoding and only encode each image once
+encodedImages = {}
+def handle_image(m):
+    fn = os.path.splitext(m[2])[0] + '.jpg'
+    encoded = encodedImages.get(fn)
+    if encoded is None:
+        with open(fn, 'rb') as image:
+            with mmap.mmap(image.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                encoded = base64.b64encode(mm).decode('ascii')
+        encodedImages[fn] = encoded
+    return f'![{m[1]}](data:image/jpeg;base64,{encoded})'
+
 cells = []
 for cell in nb.cells:
     del cell['id']
@@ -67,14 +102,7 @@ for cell in nb.cells:
         cells.append(cell)
         continue
     if cell.cell_type == 'markdown':
-        images = []
-        def handle_image(m):
-            fn = Path(m[2]).with_suffix('.jpg')
-            with open(fn, 'rb') as image:
-                encoded = base64.b64encode(image.read()).decode()
-            return f'![{m[1]}](data:image/jpeg;base64,{encoded})'
-        cell.source = re.sub(r'\!\[(.+?)\]\((.+?)\)', handle_image, cell.source)
-        attachments = {}
+        cell.source = RE_IMG.sub(handle_image, cell.source)
     cells.append(cell)
 
 nb.cells = cells
@@ -5,14 +5,18 @@ from pathlib import Path
 sys.path.insert(0, Path(__file__).parents[1].as_posix())
 import factoriocalc
 
+RE_FRONT_MATTER = re.compile(r'^---\n')
+RE_CODE_REF = re.compile(r'(?<!\`)(\`[^`]+\`)')
+RE_VERSION = re.compile(r'\{VERSION\}')
+
 with open('guide0.md', 'r') as f:
     text = f.read()
 
-text,n = re.subn(r'^---\n', '---\n# automatically generated file edit guide0.md instead\n', text)
+text,n = RE_FRONT_MATTER.subn('---\n# automatically generated file edit guide0.md instead\n', text, count = 1)
 if n != 1:
     raise RuntimeError("guide0.md does not start with '---'")
-text = re.sub(r'(?<!\`)(\`[^`]+\`)', r'{py:obj}\1', text, flags = re.DOTALL)
+text = RE_CODE_REF.sub(r'{py:obj}\1', text)
 
-text = re.sub(r'\{VERSION\}', factoriocalc.__version__, text)
+text = RE_VERSION.sub(factoriocalc.__version__, text)
 
 sys.stdout.write(text)
@@ -26,14 +26,6 @@ from . import solver
 from .solver import SolveRes
 __all__ += ['SolveRes']
 
-from . import blueprint
-from .blueprint import *
-__all__ += blueprint.__all__
-
-from . import jsonconv
-from .jsonconv import *
-__all__ += jsonconv.__all__
-
 from . import produce as _produce
 from .produce import *
 __all__ += _produce.__all__
@@ -42,6 +34,34 @@ from . import helper
 from .helper import *
 __all__ += helper.__all__
 
+## submodules not needed by the rest of the package are imported on first
+## use, the symbols they export are listed here so that __all__ can be
+## populated without importing them
+_lazyModules = {
+    'blueprint': ('Blueprint', 'BlueprintBook', 'importBlueprint'),
+    'jsonconv': ('toJsonObj', 'fromJsonObj'),
+}
+_lazySymbols = {sym: mod for mod, syms in _lazyModules.items() for sym in syms}
+for _syms in _lazyModules.values():
+    __all__ += _syms
+del _syms
+
+from importlib import import_module as _import_module
+
+def __getattr__(name):
+    if name in _lazyModules:
+        return _import_module(f'.{name}', __name__)
+    try:
+        mod = _lazySymbols[name]
+    except KeyError:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'") from None
+    val = getattr(_import_module(f'.{mod}', __name__), name)
+    globals()[name] = val
+    return val
+
+def __dir__():
+    return sorted(set(globals()) | _lazySymbols.keys() | _lazyModules.keys())
+
 ## extra symbols not export by default
 from .ordenum import OrdEnum
 from .core import Immutable
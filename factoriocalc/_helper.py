@@ -1,5 +1,10 @@
 from .core import *
 
+try:
+    from orjson import loads as jsonLoads
+except ImportError:
+    from json import loads as jsonLoads
+
 def toPythonName(name):
     """Convert all ``-`` to ``_``"""
     return name.replace('-','_')
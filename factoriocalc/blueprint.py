@@ -1,12 +1,18 @@
 from __future__ import annotations
-from collections import defaultdict
-from itertools import chain, repeat
+from binascii import a2b_base64
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, defaultdict
+from hashlib import blake2b
 from pathlib import Path
 import math
+import mmap
+import os
+from threading import Lock
+import zlib
 
 from .core import *
 from . import config, machine
-from ._helper import getDefaultFuel
+from ._helper import getDefaultFuel, jsonLoads
 
 __all__ = ('Blueprint', 'BlueprintBook', 'importBlueprint')
 
@@ -43,42 +49,61 @@ class Blueprint:
         if burnerFuel is None:
             burnerFuel = getDefaultFuel()
 
-        if recipes is None:
-            recipes = {}
+        if recipes:
+            # resolved recipe (or None) for each machine class seen so far
+            recipeForClass = {}
+            def recipeForMachine(m):
+                cls = m.__class__
+                if cls in recipeForClass:
+                    return recipeForClass[cls]
+                r = next((recipes[c] for c in cls.__mro__ if c in recipes), None)
+                recipeForClass[cls] = r
+                return r
         else:
-            recipes = recipes.copy()
-
-        def recipeForMachine(m):
-            if m.__class__ in recipes:
-                return recipes[m.__class__]
-            for c in m.__class__.__mro__:
-                if c in recipes:
-                    r = recipes[c]
-                    recipes[m.__class__] = r
-                    return r
-            recipes[m.__class__] = None
-            return None
-
-        def as_int(x):
-            if not x.is_integer():
-                raise ValueError
-            return int(x)
+            def recipeForMachine(m):
+                return None
+
+        def bbox(m):
+            position = m.blueprintInfo['position']
+            x = position['x']
+            y = position['y']
+            width = m.width
+            height = m.height
+            # widths and heights are always integers so only the minimum
+            # needs to be checked
+            x_min = x - width/2
+            y_min = y - height/2
+            if not (x_min.is_integer() and y_min.is_integer()):
+                raise ValueError(f"Invalid position for {m.name}: ({x}, {y})")
+            x_min = int(x_min)
+            y_min = int(y_min)
+            return x_min, x_min + width - 1, y_min, y_min + height - 1
 
         machines = []
         machinesOnGrid = defaultdict(list)
         beacons = []
 
+        # (isBeacon, isRocketSilo, hasFuel, hasBeacons) for each machine class
+        classFlags = {}
+
         for v in self.raw['blueprint']['entities']:
-            try:
-                cls = mchByName[v['name']]
-            except KeyError:
+            # most entities (belts, inserters, ...) are not machines
+            cls = mchByName.get(v['name'])
+            if cls is None:
                 continue
-            if issubclass(cls, machine.Beacon):
+            flags = classFlags.get(cls)
+            if flags is None:
+                flags = classFlags[cls] = (issubclass(cls, machine.Beacon),
+                                           issubclass(cls, machine.RocketSilo),
+                                           hasattr(cls, 'fuel'),
+                                           issubclass(cls, machine.ModulesMixin))
+            isBeacon, isRocketSilo, hasFuel, hasBeacons = flags
+            if isBeacon:
                 m = cls(freeze=False)
             else:
                 m = cls()
             m.blueprintInfo = v
-            if isinstance(m, machine.RocketSilo):
+            if isRocketSilo:
                 m.recipe = recipeForMachine(m)
                 if m.recipe is None:
                     m.recipe = m.defaultProduct()
@@ -88,50 +113,50 @@ class Blueprint:
                 r = recipeForMachine(m)
                 if r:
                     m.recipe = r
-            if hasattr(m, 'fuel'):
+            if hasFuel:
                 m.fuel = burnerFuel
             if 'items' in v:
-                m.modules = [*chain.from_iterable(repeat(itmByName[item], num) for item, num in v['items'].items())]
-            if isinstance(m, machine.Beacon):
+                modules = []
+                for item, num in v['items'].items():
+                    modules += [itmByName[item]] * num
+                m.modules = modules
+            if isBeacon:
                 m._frozen = True
                 beacons.append(m)
                 continue
             if m:
                 machines.append(m)
-            if m and hasattr(m, 'beacons'):
-                position = m.blueprintInfo['position']
-                try:
-                    x_min = as_int(position['x'] - m.width/2)
-                    x_max = as_int(position['x'] + m.width/2) - 1
-                    y_min = as_int(position['y'] - m.height/2)
-                    y_max = as_int(position['y'] + m.height/2) - 1
-                    machinesOnGrid[(x_min, x_max)].append((y_min, y_max, m))
-                except ValueError as exc:
-                    raise ValueError(f"Invalid position for {m.name}: ({position['x']}, {position['y']})") from exc
-
-        machinesById = {}
-        beaconsForMachine = defaultdict(list)
+            if m and hasBeacons:
+                x_min, x_max, y_min, y_max = bbox(m)
+                machinesOnGrid[(x_min, x_max)].append((y_min, y_max, len(machines) - 1))
+
+        # sort the columns by their starting position so that only the columns
+        # that can be in range of a beacon need to be checked
+        columns = sorted(machinesOnGrid.items())
+        columnStarts = [x_min for (x_min, _), _ in columns]
+        maxWidth = max((x_max - x_min + 1 for x_min, x_max in machinesOnGrid), default = 0)
+
+        # beacons for each machine, indexed by the machine's position in machines
+        beaconsForMachine = [[] for _ in machines]
         for beacon in beacons:
-            position = beacon.blueprintInfo['position']
-            try:
-                b_x_min = as_int(position['x'] - beacon.width/2) - beacon.supplyAreaDistance
-                b_x_max = as_int(position['x'] + beacon.width/2) + beacon.supplyAreaDistance - 1
-                b_y_min = as_int(position['y'] - beacon.height/2) - beacon.supplyAreaDistance
-                b_y_max = as_int(position['y'] + beacon.height/2) + beacon.supplyAreaDistance - 1
-            except ValueError as exc:
-                raise ValueError(f"Invalid position for {beacon.name}: ({position['x']}, {position['y']})") from exc
-
-            for (m_x_min, m_x_max), yp in machinesOnGrid.items():
-                if b_x_min <= m_x_max and m_x_min <= b_x_max:
-                    for m_y_min, m_y_max, m in yp:
-                        if b_y_min <= m_y_max and m_y_min <= b_y_max:
-                            machinesById[id(m)] = m
-                            beaconsForMachine[id(m)].append(beacon)
+            x_min, x_max, y_min, y_max = bbox(beacon)
+            distance = beacon.supplyAreaDistance
+            b_x_min = x_min - distance
+            b_x_max = x_max + distance
+            b_y_min = y_min - distance
+            b_y_max = y_max + distance
 
-        for m_id, m_beacons in beaconsForMachine.items():
-            machinesById[m_id].beacons = m_beacons
+            lo = bisect_left(columnStarts, b_x_min - maxWidth + 1)
+            hi = bisect_right(columnStarts, b_x_max)
+            for (m_x_min, m_x_max), yp in columns[lo:hi]:
+                if b_x_min <= m_x_max:
+                    for m_y_min, m_y_max, idx in yp:
+                        if b_y_min <= m_y_max and m_y_min <= b_y_max:
+                            beaconsForMachine[idx].append(beacon)
 
-        b = Group(beacons)
+        for m, m_beacons in zip(machines, beaconsForMachine):
+            if m_beacons:
+                m.beacons = m_beacons
 
         return Group(Group(machines), Group(beacons))
 
@@ -157,15 +182,16 @@ class BlueprintBook:
         return BlueprintBook._find(self.raw, label)
     @staticmethod
     def _find(bp, label):
-        if 'blueprint' in bp:
-            if bp['blueprint'].get('label',None) == label:
-                return Blueprint(bp)
-        elif 'blueprint_book' in bp:
-            for b in bp['blueprint_book']['blueprints']:
-                try:
-                    return BlueprintBook._find(b, label)
-                except KeyError:
-                    pass
+        # depth first search using an explicit stack, nested books are pushed
+        # in reverse so that blueprints are visited in order
+        stack = [bp]
+        while stack:
+            bp = stack.pop()
+            if 'blueprint' in bp:
+                if bp['blueprint'].get('label',None) == label:
+                    return Blueprint(bp)
+            elif 'blueprint_book' in bp:
+                stack.extend(reversed(bp['blueprint_book']['blueprints']))
         raise KeyError(label)
     def labels(self) -> list[str]:
         lst = []
@@ -173,20 +199,57 @@ class BlueprintBook:
         return lst
     @staticmethod
     def _labels(bp, lst):
-        if 'blueprint' in bp:
-            lst.append(bp['blueprint'].get('label',None))
-        elif 'blueprint_book' in bp:
-            for b in bp['blueprint_book']['blueprints']:
-                BlueprintBook._labels(b, lst)
+        stack = [bp]
+        while stack:
+            bp = stack.pop()
+            if 'blueprint' in bp:
+                lst.append(bp['blueprint'].get('label',None))
+            elif 'blueprint_book' in bp:
+                stack.extend(reversed(bp['blueprint_book']['blueprints']))
+
+def _decompress(bpStr):
+    # skip the version byte using a memoryview to avoid copying the string,
+    # a2b_base64 (unlike b64decode) accepts it without making a copy
+    if isinstance(bpStr, str):
+        bpStr = bpStr.encode('ascii')
+    with memoryview(bpStr) as view:
+        decoded = a2b_base64(view[1:])
+    # blueprint JSON typically compresses 10-15 times, so start with a buffer
+    # 8 times the compressed size to avoid most of the incremental growth,
+    # zlib trims the result to size
+    return zlib.decompress(decoded, bufsize = len(decoded) * 8)
+
+# Only the decompressed bytes are cached as they are immutable, the JSON is
+# parsed again on each call so that blueprints never share state.  The cache
+# is keyed on a digest of the blueprint string so that the (possibly large)
+# string itself is not kept alive.  The lock only guards the cache itself,
+# decompression is done outside of it.
+_decompressCache = OrderedDict()
+_decompressCacheLock = Lock()
+_DECOMPRESS_CACHE_SIZE = 8
+
+def _cachedDecompress(bpStr):
+    if isinstance(bpStr, str):
+        bpStr = bpStr.encode('ascii')
+    key = blake2b(bpStr).digest()
+    with _decompressCacheLock:
+        decompressed = _decompressCache.get(key)
+        if decompressed is not None:
+            _decompressCache.move_to_end(key)
+            return decompressed
+    decompressed = _decompress(bpStr)
+    with _decompressCacheLock:
+        _decompressCache[key] = decompressed
+        _decompressCache.move_to_end(key)
+        if len(_decompressCache) > _DECOMPRESS_CACHE_SIZE:
+            _decompressCache.popitem(last = False)
+    return decompressed
 
 def importBlueprint(arg = None, *, file = None):
     """Decode *arg* to a blueprint or blueprint book.  If *arg* is a `pathlib.Path
     <https://docs.python.org/3/library/pathlib.html>`_ or the *file* argument
     is provided than read the contents from a file, otherwise decode the
     string provided."""
-    import zlib
-    from base64 import b64decode
-    import json
 
     if arg is None:
         if file is None:
@@ -196,16 +259,23 @@ def importBlueprint(arg = None, *, file = None):
         raise TypeError('both arg and file cannot be be defined at the same time')
 
     if isinstance(arg, Path):
-        bpStr = arg.read_bytes()
+        # map the file rather than reading it into memory first, an empty
+        # file can not be mapped so decode it directly to get the same error
+        # as an empty string
+        with open(arg, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                decompressed = _decompress(b'')
+            else:
+                with mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ) as mm:
+                    decompressed = _decompress(mm)
+    elif isinstance(arg, (str, bytes)):
+        decompressed = _cachedDecompress(arg)
     else:
-        bpStr = arg
-
-    decoded = b64decode(bpStr[1:])
-    decompressed = zlib.decompress(decoded)
-    json = json.loads(decompressed)
+        decompressed = _decompress(arg)
+    bp = jsonLoads(decompressed)
 
-    if 'blueprint_book' in json:
-        return BlueprintBook(json)
+    if 'blueprint_book' in bp:
+        return BlueprintBook(bp)
     else:
-        return Blueprint(json)
+        return Blueprint(bp)
 
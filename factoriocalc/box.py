@@ -7,7 +7,7 @@ from numbers import Number
 import sys
 import operator
 
-from .fracs import frac, div, ceil, Inf
+from .fracs import frac, div, ceil, Inf, Frac
 from .core import *
 from .core import _MutableFlows,NetFlows
 from ._helper import asItem
@@ -59,7 +59,14 @@ class Term(tuple):
     item.__doc__ = None
 
     def __new__(cls, arg):
-        if isinstance(arg, Number):
+        # check the common exact types first as isinstance against the Number
+        # ABC is comparatively slow
+        argType = type(arg)
+        if argType is int or argType is Frac:
+            return tuple.__new__(cls, (arg, None))
+        elif argType is tuple:
+            return tuple.__new__(cls, arg)
+        elif isinstance(arg, Number):
             return tuple.__new__(cls, (arg, None))
         elif isinstance(arg, Ingredient):
             return tuple.__new__(cls, (1, arg))
@@ -122,6 +129,17 @@ class AtLeast(Inequality):
 #    __slots__ = ()
 #    symbol = '<='
 
+def _fmtTerm(num, item):
+    if num == 1:
+        return f'{item}'
+    elif num == -1:
+        return f'-{item}'
+    else:
+        return f'{num}*{item}'
+
+def _priorityKeyStr(k):
+    return f'itm.{k}' if isinstance(k, Ingredient) else f'rcp.{k}'
+
 class Box(BoxBase):
     """Wraps a group to restrict inputs or outputs."""
     MIN_PRIORITY =  IGNORE # (-100)
@@ -174,7 +192,8 @@ class Box(BoxBase):
             item = asItem(item)
             if rate is None:
                 return dict.__setitem__(self, item, None)
-            rate = frac(rate)
+            if type(rate) is not int and type(rate) is not Frac:
+                rate = frac(rate)
             if rate < 0:
                 raise ValueError
             return dict.__setitem__(self, item, rate)
@@ -186,7 +205,8 @@ class Box(BoxBase):
             item = asItem(item)
             if rate is None:
                 return dict.__setitem__(self, item, None)
-            rate = frac(rate)
+            if type(rate) is not int and type(rate) is not Frac:
+                rate = frac(rate)
             if rate > 0:
                 rate = -rate
             return dict.__setitem__(self, item, rate)
@@ -197,7 +217,8 @@ class Box(BoxBase):
             item = asItem(item)
             if rate is None:
                 return dict.__setitem__(self, item, None)
-            rate = frac(rate)
+            if type(rate) is not int and type(rate) is not Frac:
+                rate = frac(rate)
             return dict.__setitem__(self, item, rate)
 
     class _Dict(dict):
@@ -211,20 +232,14 @@ class Box(BoxBase):
     class SimpleConstraints(_Dict):
         __slots__ = ()
         def __str__(self):
-            def fmtTerm(num, item):
-                if num == 1:
-                    return f'{item}'
-                elif num == -1:
-                    return f'-{item}'
-                else:
-                    return f'{item}*{rate}'
-            return ', '.join(str(item) if rate is None
-                             else f'{item} >= {rate}' if isinstance(rate, Number)
-                             else f'{item} = {fmtTerm(*rate)}'
-                             for item,rate in self.items())
+            return ', '.join([str(item) if rate is None
+                              else f'{item} >= {rate}' if isinstance(rate, Number)
+                              else f'{item} = {_fmtTerm(*rate)}'
+                              for item,rate in self.items()])
         def __setitem__(self, item, rate):
             item = asItem(item)
-            rate = frac(rate)
+            if type(rate) is not int and type(rate) is not Frac:
+                rate = frac(rate)
             return dict.__setitem__(self, item, rate)
         def _jsonObj(self):
             from .jsonconv import _jsonObj
@@ -232,17 +247,16 @@ class Box(BoxBase):
 
     class OtherConstraints(list):
         def __str__(self):
-            return ', '.join(f'({c})' for c in self)
+            return ', '.join([f'({c})' for c in self])
         pass
 
     class Priorities(_Dict):
         __slots__ = ()
         def __str__(self):
-            def tostr(k):
-                return f'itm.{k}' if isinstance(k, Ingredient) else f'rcp.{k}'
-            return ', '.join(f'ignore {tostr(k)}' if p <= IGNORE else f'{tostr(k)}: {p}' for k, p in self.items())
+            return ', '.join([f'ignore {_priorityKeyStr(k)}' if p <= IGNORE else f'{_priorityKeyStr(k)}: {p}' for k, p in self.items()])
         def __setitem__(self, key, priority):
-            priority = frac(priority)
+            if type(priority) is not int and type(priority) is not Frac:
+                priority = frac(priority)
             if priority < Box.MIN_PRIORITY or priority > Box.MAX_PRIORITY:
                 raise ValueError('priority must be between {Box.MIN_PRIORITY} and {Box.MAX_PRIORITY}, inclusive')
             return dict.__setitem__(self, key, priority)
@@ -360,8 +374,6 @@ class Box(BoxBase):
         if len(args) > 0:
             raise TypeError('too many positional arguments provided')
 
-        from .solver import SolveRes
-
         if not isinstance(inner, Group):
             inner = Group(inner)
 
@@ -392,35 +404,39 @@ class Box(BoxBase):
         outputs_ = set()
         products_ = set()
         innerUnconstrained = set()
-        for m in self.inner.flatten():
-            inputs_ |= m.inputs.keys()
-            outputs_ |= m.outputs.keys()
-            products_ |= m.products.keys()
+        unconstrainedHints = self.unconstrainedHints
+        for m in self.inner._flatList():
+            inputs_.update(m.inputs)
+            outputs_.update(m.outputs)
+            products_.update(m.products)
             if isinstance(m, Box):
-                innerUnconstrained |= m.unconstrained.keys()
-                self.unconstrainedHints |= m.unconstrained.keys()
-                self.unconstrainedHints |= m.unconstrainedHints
+                innerUnconstrained.update(m.unconstrained)
+                unconstrainedHints.update(m.unconstrained)
+                unconstrainedHints.update(m.unconstrainedHints)
 
         self.__flows = inputs_ | outputs_
 
-        self.byproducts_ = frozenset(outputs_ - products_)
+        self.byproducts_ = frozenset(outputs_.difference(products_))
 
-        self.unconstrainedHints |= self.byproducts_ & inputs_
+        unconstrainedHints.update(self.byproducts_.intersection(inputs_))
 
-        for item in (innerUnconstrained - inputs_ - outputs_):
+        for item in innerUnconstrained.difference(inputs_, outputs_):
             self.unconstrained.add(item)
 
         if outputs is None or inputs is None:
             common = inputs_ & outputs_
+            unconstrained = self.unconstrained
+            # the derived flows are already items without a rate so add them
+            # directly rather than going through __setitem__
             if outputs is None:
-                self.outputs = Box.Outputs(sorted(outputs_ - common - innerUnconstrained - self.unconstrained.keys()))
+                dict.update(self.outputs, dict.fromkeys(sorted(outputs_.difference(common, innerUnconstrained, unconstrained))))
             if inputs is None:
                 if allowExtraInputs:
-                    self.inputs = Box.Inputs(inputs_ - self.outputs.keys() - innerUnconstrained - self.unconstrained.keys())
+                    dict.update(self.inputs, dict.fromkeys(inputs_.difference(self.outputs, innerUnconstrained, unconstrained)))
                     for item in self.inputs.keys() & common:
                         self.priorities[item] = IGNORE
                 else:
-                    self.inputs = Box.Inputs(sorted(inputs_ - common - self.unconstrained.keys()))
+                    dict.update(self.inputs, dict.fromkeys(sorted(inputs_.difference(common, unconstrained))))
 
         for item in extraOutputs:
             self.outputs[item] = None
@@ -444,9 +460,9 @@ class Box(BoxBase):
                 self.inputs[item] = rate
                 inputRates[item] = rate
 
-        self.outputs = Box.Outputs((item,rate) for item, rate in self.outputs.items() if rate != 0)
-
-        self.inputs = Box.Inputs((item,rate) for item, rate in self.inputs.items() if rate != 0)
+        for flows in (self.outputs, self.inputs):
+            for item in [item for item, rate in flows.items() if rate == 0]:
+                del flows[item]
 
         if outputsLoose:
             for item, rate in outputRates.items():
@@ -484,19 +500,30 @@ class Box(BoxBase):
 
     @property
     def products(self):
-        return Box.Outputs((item,rate) for item,rate in self.outputs.items()
-                           if item not in self.byproducts_ and self.priorities.get(item, 0) != IGNORE)
+        return self._splitOutputs()[0]
 
     @property
     def byproducts(self):
-        return Box.Outputs((item,rate) for item,rate in self.outputs.items()
-                           if item in self.byproducts_ or self.priorities.get(item, 0) == IGNORE)
+        return self._splitOutputs()[1]
+
+    def _splitOutputs(self):
+        # outputs and priorities can be modified after the box is created so
+        # the split is not cached, but both halves are built in a single pass
+        products = Box.Outputs()
+        byproducts = Box.Outputs()
+        byproducts_ = self.byproducts_
+        priorities = self.priorities
+        for item, rate in self.outputs.items():
+            if item in byproducts_ or priorities.get(item, 0) == IGNORE:
+                dict.__setitem__(byproducts, item, rate)
+            else:
+                dict.__setitem__(products, item, rate)
+        return products, byproducts
 
     def internal(self):
         return self.__flows - self.inputs.keys() - self.outputs.keys()
 
     def _jsonObj(self, objs, **kwargs):
-        from .jsonconv import _jsonObj
         if id(self) in objs:
             return objs[id(self)]
         obj = {}
@@ -511,6 +538,13 @@ class Box(BoxBase):
                 obj[k] = v._jsonObj()
         return obj
 
+    def __copy__(self):
+        # same result as the default shallow copy but without going through
+        # the generic __reduce_ex__ protocol
+        obj = object.__new__(self.__class__)
+        obj.__dict__.update(self.__dict__)
+        return obj
+
     def summarize(self):
         """:meta private:"""
         obj = _copy(self)
@@ -554,9 +588,8 @@ class Box(BoxBase):
             out.write(f'{prefix}{namePrefix}{self.name}{nameSuffix}:\n')
 
     def _footer(self, out, prefix, flows = None):
-        byproducts = self.byproducts
+        products, byproducts = self._splitOutputs()
         if byproducts:
-            products = self.products
             out.write(f'{prefix}Products: {products.str(flows)}\n')
             out.write(f'{prefix}Byproducts: {byproducts.str(flows)}\n')
         else:
@@ -584,7 +617,6 @@ class Box(BoxBase):
         documenation for meaning of the enum values.
 
         """
-        from .solver import SolveRes
         solver = self.solver()
         solver.solve()
         res, _ = solver.apply()
@@ -597,71 +629,92 @@ class Box(BoxBase):
 
     def _flows(self, throttle, _includeInner):
         res = _MutableFlows()
+        byItem = res.byItem
         orig = self.inner._flows(throttle = None, _includeInner = False)
         state = orig.state
         if throttle is None:
             throttle = 1
         else:
             throttle = frac(throttle)
-        for item,rate in self.outputs.items():
+        outputs = self.outputs
+        inputs = self.inputs
+        unconstrained = self.unconstrained
+        simpleConstraints = self.simpleConstraints
+        UNDERFLOW = FlowsState.UNDERFLOW
+        UNSOLVED = FlowsState.UNSOLVED
+        for item,rate in outputs.items():
             flow = orig[item]
             underflow = flow.underflow
             annotation = ''
-            if flow.rate() < 0:
-                state = max(state, FlowsState.UNSOLVED)
+            flowRate = flow.rate()
+            minRate = simpleConstraints.get(item)
+            if flowRate < 0:
+                if state < UNSOLVED:
+                    state = UNSOLVED
                 annotation = '!'
-            elif rate is not None and flow.rate() < rate:
+            elif rate is not None and flowRate < rate:
                 underflow = True
-            elif item in self.simpleConstraints and flow.rate() < self.simpleConstraints[item]:
+            elif minRate is not None and flowRate < minRate:
                 underflow = True
-            elif rate is not None and flow.rate() > rate:
-                state = max(state, FlowsState.UNSOLVED)
+            elif rate is not None and flowRate > rate:
+                if state < UNSOLVED:
+                    state = UNSOLVED
                 annotation = '*'
             if underflow:
                 annotation = '!'
-                state = max(state, FlowsState.UNDERFLOW)
+                if state < UNDERFLOW:
+                    state = UNDERFLOW
             if _includeInner:
-                res.byItem[item] = flow.copy(factor = throttle, adjusted = False, underflow = underflow, annotation = annotation)
+                byItem[item] = flow.copy(factor = throttle, adjusted = False, underflow = underflow, annotation = annotation)
             else:
-                res.byItem[item] = Flow(item, rateOut = flow.rate() * throttle, underflow = underflow, annotation = annotation)
+                byItem[item] = Flow(item, rateOut = flowRate * throttle, underflow = underflow, annotation = annotation)
+        electricity = itm.electricity
         for flow in orig:
-            if flow.item in self.outputs or flow.item in self.inputs or flow.item is itm.electricity:
+            item = flow.item
+            if item in outputs or item in inputs or item is electricity:
                 continue
             if flow.rateIn == 0 == flow.rateOut:
                 continue
             annotation = ''
-            if flow.item not in self.unconstrained:
-                if flow.rate() < 0:
-                    state = max(state, FlowsState.UNSOLVED)
+            isUnconstrained = item in unconstrained
+            if not isUnconstrained:
+                flowRate = flow.rate()
+                if flowRate < 0:
+                    if state < UNSOLVED:
+                        state = UNSOLVED
                     annotation = '!'
-                elif flow.rate() > 0:
-                    state = max(state, FlowsState.UNSOLVED)
+                elif flowRate > 0:
+                    if state < UNSOLVED:
+                        state = UNSOLVED
                     annotation = '*'
-            if _includeInner or flow.item in self.unconstrained:
-                res.byItem[flow.item] = flow.copy(factor = throttle, adjusted = False, annotation = annotation)
-            else:
-                pass
-        for item,rate in self.inputs.items():
+            if _includeInner or isUnconstrained:
+                byItem[item] = flow.copy(factor = throttle, adjusted = False, annotation = annotation)
+        for item,rate in inputs.items():
             flow = orig[item]
             annotation = ''
-            if flow.rate() > 0 or (rate is not None and flow.rate() < rate):
-                state = max(state, FlowsState.UNSOLVED)
+            flowRate = flow.rate()
+            minRate = simpleConstraints.get(item)
+            if flowRate > 0 or (rate is not None and flowRate < rate):
+                if state < UNSOLVED:
+                    state = UNSOLVED
                 annotation = '!'
-            elif item in self.simpleConstraints and flow.rate() < self.simpleConstraints[item]:
-                state = max(state, FlowsState.UNSOLVED)
+            elif minRate is not None and flowRate < minRate:
+                if state < UNSOLVED:
+                    state = UNSOLVED
                 annotation = '!'
-            elif rate is not None and flow.rate() > rate:
-                state = max(state, FlowsState.UNSOLVED)
+            elif rate is not None and flowRate > rate:
+                if state < UNSOLVED:
+                    state = UNSOLVED
                 annotation = '*'
             if flow.rateIn == 0 == flow.rateOut and annotation == '':
                 continue
             if _includeInner:
-                res.byItem[item] = flow.copy(factor = throttle, adjusted = False, annotation = annotation)
+                byItem[item] = flow.copy(factor = throttle, adjusted = False, annotation = annotation)
             else:
-                res.byItem[item] = Flow(item, rateIn = -flow.rate() * throttle, underflow = underflow, annotation = annotation)
-        res.byItem[itm.electricity] = orig[itm.electricity]
+                byItem[item] = Flow(item, rateIn = -flowRate * throttle, underflow = underflow, annotation = annotation)
+        byItem[electricity] = orig[electricity]
         if not _includeInner and not state.ok():
-            res.byItem.clear()
+            byItem.clear()
         res.state = state
         res.reorder()
         return BoxFlows(res)
@@ -669,10 +722,10 @@ class Box(BoxBase):
     def flowSummary(self, out = None, includeInner = False):
         if out is None:
             out = sys.stdout
-        flowTally = defaultdict(lambda: defaultdict(lambda: 0))
+        flowTally = defaultdict(int)
         nameLookup = {}
         boxNum = 1
-        for m in self.inner.flatten():
+        for m in self.inner._flatList():
             m = m.machine
             if m.recipe:
                 id_ = m.recipe
@@ -691,27 +744,28 @@ class Box(BoxBase):
             for flow in m.flows():
                 rate = flow.rate()
                 if rate != 0:
-                    flowTally[flow.item][id_] += rate
+                    flowTally[flow.item, id_] += rate
+
+        tallyByItem = {}
+        for (item, id_), rate in flowTally.items():
+            tallyByItem.setdefault(item, []).append((id_, rate))
 
         flows = self.flows()
 
         def printFlows(label, items):
             out.write(f'{label}:\n')
-            for item in items:
+            for item in list(items):
                 out.write(f'  {flows[item]}:')
-                for id_,rate in flowTally[item].items():
+                for id_,rate in tallyByItem.pop(item, ()):
                     if isinstance(id_, Recipe):
                         name = id_.alias
                     else:
                         name = nameLookup[id_]
                     out.write(f' {name} {rate:.3g},')
                 out.write('\n')
-            for item in list(items):
-                del flowTally[item]
 
-        byproducts = self.byproducts
+        products, byproducts = self._splitOutputs()
         if byproducts:
-            products = self.products
             printFlows('Products', products.keys())
             printFlows('Byproducts', byproducts.keys())
         else:
@@ -719,7 +773,7 @@ class Box(BoxBase):
         printFlows('Inputs', self.inputs.keys())
         if self.unconstrained:
             printFlows('Unconstrained', self.unconstrained)
-        printFlows('Other', flowTally.keys())
+        printFlows('Other', tallyByItem.keys())
 
     def internalFlows(self):
         res = _MutableFlows()
@@ -742,11 +796,18 @@ class Box(BoxBase):
                 continue
             if throttle == 1:
                 candidates.append(m)
+        # index the machines by input once rather than searching the inner
+        # group for every output of every candidate
+        consumers = defaultdict(list)
+        if candidates:
+            for m in self.inner:
+                for item in m.inputs:
+                    consumers[item].append(m)
         result = []
         for m1 in candidates:
             throttling = []
             for item in m1.outputs:
-                for m2 in self.inner.find(input = item):
+                for m2 in consumers.get(item, ()):
                     try:
                         throttle = m2.machine.throttle
                     except AttributeError:
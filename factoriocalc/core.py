@@ -682,9 +682,14 @@ class Group(Sequence,MachineBase):
             m._flatten(lst, num)
 
     def flatten(self):
+        return Group(self._flatList())
+
+    def _flatList(self):
+        # like flatten() but returns a plain list, avoids the cost of
+        # constructing a new Group when only iterating over the result
         lst = []
         self._flatten(lst, 1)
-        return Group(lst)
+        return lst
 
     def __iter__(self):
         return iter(self.machines)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 import dataclasses as _dc
+from collections import defaultdict as _defaultdict
 
 @_dc.dataclass
 class CraftingHint:
@@ -50,14 +51,19 @@ class GameInfo:
     modules: Modules = _dc.field(default_factory = Modules)
 
     def finalize(self):
-        self.recipesThatMake = {}
-        self.recipesThatUse = {}
+        recipesThatMake = _defaultdict(list)
+        recipesThatUse = _defaultdict(list)
 
         for r in self.rcpByName.values():
             for _, _, item in r.outputs:
-                self.recipesThatMake.setdefault(item, []).append(r)
+                recipesThatMake[item].append(r)
             for _, _, item in r.inputs:
-                self.recipesThatUse.setdefault(item, []).append(r)
+                recipesThatUse[item].append(r)
+
+        # convert back to plain dicts so that lookups of unknown items still
+        # raise KeyError
+        self.recipesThatMake = dict(recipesThatMake)
+        self.recipesThatUse = dict(recipesThatUse)
 
         from .core import Module
         for m in self.itmByName.values():
@@ -6,6 +6,7 @@ import numbers
 import operator
 import re
 import math
+from functools import lru_cache
 
 from .contextvars_ import ContextVar
 
@@ -36,35 +37,7 @@ def frac(num = 0, den = None, *, float_conv_method = 'if int'):
             return num
 
         elif isinstance(num, str):
-            # Handle construction from strings.  Adopted from python fractions.py
-            m = _RATIONAL_FORMAT.fullmatch(num)
-            if m is None:
-                raise ValueError(f'invalid literal for fraction: {num!r}')
-            if m.group('nan') is not None:
-                num = NaN
-            elif m.group('inf') is not None:
-                num = Inf
-            else:
-                num = int(m.group('num') or '0')
-                denom = m.group('denom')
-                if denom:
-                    den = int(denom)
-                else:
-                    den = 1
-                    decimal = m.group('decimal')
-                    if decimal:
-                        scale = 10**len(decimal)
-                        num = num * scale + int(decimal)
-                        den *= scale
-                    exp = m.group('exp')
-                    if exp:
-                        exp = int(exp)
-                        if exp >= 0:
-                            num *= 10**exp
-                        else:
-                            den *= 10**-exp
-            if m.group('sign') == '-':
-                num = -num
+            num, den = _parseFracStr(num)
             if den is None: # special value
                 return num
 
@@ -94,6 +67,42 @@ def frac(num = 0, den = None, *, float_conv_method = 'if int'):
 
     return div(frac(num), den)
 
+@lru_cache(maxsize = 1024)
+def _parseFracStr(num):
+    # Handle construction from strings.  Adopted from python fractions.py.
+    # Returns the numerator and denominator, or a special value and None.  The
+    # result is cached as the same literal rates tend to be used many times.
+    m = _RATIONAL_FORMAT.fullmatch(num)
+    if m is None:
+        raise ValueError(f'invalid literal for fraction: {num!r}')
+    den = None
+    if m.group('nan') is not None:
+        num = NaN
+    elif m.group('inf') is not None:
+        num = Inf
+    else:
+        num = int(m.group('num') or '0')
+        denom = m.group('denom')
+        if denom:
+            den = int(denom)
+        else:
+            den = 1
+            decimal = m.group('decimal')
+            if decimal:
+                scale = 10**len(decimal)
+                num = num * scale + int(decimal)
+                den *= scale
+            exp = m.group('exp')
+            if exp:
+                exp = int(exp)
+                if exp >= 0:
+                    num *= 10**exp
+                else:
+                    den *= 10**-exp
+    if m.group('sign') == '-':
+        num = -num
+    return num, den
+
 def frac_from_real(other):
     try:
         return frac(*other.as_integer_ratio())
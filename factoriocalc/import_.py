@@ -1,17 +1,24 @@
 from __future__ import annotations
-import json
 from pathlib import Path
 from . import data,machine
 from .machine import Category
 from .fracs import frac, frac_from_float_round
 from .core import *
 from .data import CraftingHint,GameInfo
-from ._helper import toPythonName,toClassName
+from ._helper import toPythonName,toClassName,jsonLoads
 from collections import defaultdict
+from sys import intern
 import os
 
 _dir = Path(__file__).parent.resolve()
 
+# base class for each entity type imported as a new machine class, and if the
+# machine is a crafting machine
+_machineBases = {'assembling-machine': (machine.AssemblingMachine, True),
+                 'furnace': (machine.Furnace, True),
+                 'rocket-silo': (machine.RocketSilo, True),
+                 'beacon': (machine.Beacon, False)}
+
 def userRecipesFile():
     """Attempt to determine the location of the JSON file created by the "Recipe
      Exporter" mod."""
@@ -24,6 +31,10 @@ def userRecipesFile():
     else:
         return None
 
+def _loadJson(path):
+    with open(path, 'rb') as f:
+        return jsonLoads(f.read())
+
 def setGameConfig(mode, path = None, includeDisabled=True):
     """Changes the game configuration.
 
@@ -74,8 +85,7 @@ def setGameConfig(mode, path = None, includeDisabled=True):
     else:
         importFun = mode
 
-    with open(path) as f:
-        gameInfo = json.load(f)
+    gameInfo = _loadJson(path)
 
     return importFun(gameInfo,
                      includeDisabled = includeDisabled)
@@ -102,28 +112,28 @@ def _importGameInfo(gameInfo, includeDisabled, commonByproducts_, rocketRecipeHi
     disabledRecipes = set()
 
     groups = gameInfo['groups']
+    itemsInfo = gameInfo['items']
+    fluidsInfo = gameInfo['fluids']
 
     def getOrderKey(d):
         return (groups[d['group']]['order'],groups[d['subgroup']]['order'],d['order'])
 
     def addItem(item, descr = ''):
         name = item.name
-        pythonName = toPythonName(name)
         itmByName[name] = item
         if descr:
             translatedNames[f'itm {item.name}'] = descr
 
     def lookupItem(name):
-        try:
-            return itmByName[name]
-        except KeyError:
-            pass
-        pythonName = toPythonName(name)
-        try:
-            d = gameInfo['items'][name]
+        item = itmByName.get(name)
+        if item is not None:
+            return item
+        name = intern(name)
+        d = itemsInfo.get(name)
+        if d is not None:
             item = Item(name, getOrderKey(d), d['stack_size'], fuelValue=d['fuel_value'], fuelCategory=d.get('fuel_category',''))
-        except KeyError:
-            d = gameInfo['fluids'][name]
+        else:
+            d = fluidsInfo[name]
             item = Fluid(name, getOrderKey(d))
         descr = d.get('translated_name', '')
         addItem(item, descr)
@@ -131,7 +141,6 @@ def _importGameInfo(gameInfo, includeDisabled, commonByproducts_, rocketRecipeHi
 
     def addRecipe(recipe, descr = ''):
         name = recipe.name
-        pythonName = toPythonName(name)
         rcpByName[name] = recipe
         if descr:
             translatedNames[f'rcp {recipe.name}'] = descr
@@ -155,7 +164,7 @@ def _importGameInfo(gameInfo, includeDisabled, commonByproducts_, rocketRecipeHi
                     if n != '*fluid*':
                         commonByproducts.add(n)
                 prev = n
-    fluids = {n for n in commonByproducts if n in gameInfo['fluids']}
+    fluids = {n for n in commonByproducts if n in fluidsInfo}
     for a,bs in byproductPriority.items():
         if '*fluid*' in bs:
             bs.remove('*fluid*')
@@ -173,31 +182,15 @@ def _importGameInfo(gameInfo, includeDisabled, commonByproducts_, rocketRecipeHi
                     again = True
 
     # import machines
+    baseTuples = {}
+    categoryMembers = {}
+    craftingMachines = []
     for k,v in gameInfo['entities'].items():
         if 'hidden' in v.get('flags',[]): continue
         clsName = toClassName(v['name'])
-        bases = []
-        module_inventory_size = v.get('module_inventory_size', 0)
-        if module_inventory_size > 0 and v['type'] != 'beacon':
-            bases.append(machine.ModulesMixin)
-        energy_source = v.get('energy_source', None)
-        if energy_source == 'burner':
-            bases.append(machine.BurnerMixin)
-        elif energy_source == 'electric':
-            bases.append(machine.ElectricMixin)
-        isCraftingMachine = False
-        if v['type'] == 'assembling-machine':
-            isCraftingMachine = True
-            bases.append(machine.AssemblingMachine)
-        elif v['type'] == 'furnace':
-            isCraftingMachine = True
-            bases.append(machine.Furnace)
-        elif v['type'] == 'rocket-silo':
-            isCraftingMachine = True
-            bases.append(machine.RocketSilo)
-        elif v['type'] == 'beacon':
-            bases.append(machine.Beacon)
-        else:
+        try:
+            base, isCraftingMachine = _machineBases[v['type']]
+        except KeyError:
             existing = getattr(machine, clsName, None)
             if existing is not None:
                 cls = existing
@@ -205,48 +198,71 @@ def _importGameInfo(gameInfo, includeDisabled, commonByproducts_, rocketRecipeHi
                 #cls.__module__ = mch
                 mchByName[cls.name] = cls
             continue
-        dict = {'name': v['name'],
-                'type': v['type'],
-                'order': getOrderKey(v),
-                'group': v['group'],
-                'subgroup': v['group'],
-                'width': frac(v['width']),
-                'height': frac(v['height'])}
-        cls = type(clsName, tuple(bases), dict)
-        cls.__module__ = mch
+        module_inventory_size = v.get('module_inventory_size', 0)
+        energy_source = v.get('energy_source', None)
+        # only a handful of combinations of base classes are used, so share
+        # the tuples between machines
+        key = (module_inventory_size > 0 and base is not machine.Beacon, energy_source, base)
+        bases = baseTuples.get(key)
+        if bases is None:
+            bases = []
+            if key[0]:
+                bases.append(machine.ModulesMixin)
+            if energy_source == 'burner':
+                bases.append(machine.BurnerMixin)
+            elif energy_source == 'electric':
+                bases.append(machine.ElectricMixin)
+            bases.append(base)
+            bases = baseTuples[key] = tuple(bases)
+        attrs = {'__module__': mch,
+                 'name': intern(v['name']),
+                 'type': v['type'],
+                 'order': getOrderKey(v),
+                 'group': v['group'],
+                 'subgroup': v['group'],
+                 'width': frac(v['width']),
+                 'height': frac(v['height'])}
+        # collect all class attributes before creating the class rather than
+        # assigning them one at a time afterwards
         if energy_source is not None:
-            cls.baseEnergyUsage = frac(v['energy_consumption'], float_conv_method = 'round')
-            cls.energyDrain = frac(v['drain'], float_conv_method = 'round')
-            cls.pollution = frac(v['pollution'], float_conv_method = 'round')
+            attrs['baseEnergyUsage'] = frac(v['energy_consumption'], float_conv_method = 'round')
+            attrs['energyDrain'] = frac(v['drain'], float_conv_method = 'round')
+            attrs['pollution'] = frac(v['pollution'], float_conv_method = 'round')
         if isCraftingMachine:
-            cls.craftingSpeed = frac(v['crafting_speed'], float_conv_method = 'round')
-            for c in v['crafting_categories']:
-                if c in categories:
-                    categories[c].members.append(cls)
-                else:
-                    categories[c] = Category(c, [cls])
-            cls.craftingCategories = {categories[c] for c in v['crafting_categories']}
+            attrs['craftingSpeed'] = frac(v['crafting_speed'], float_conv_method = 'round')
         if module_inventory_size > 0:
-            cls.moduleInventorySize = module_inventory_size
-            cls.allowdEffects = v['allowed_effects']
+            attrs['moduleInventorySize'] = module_inventory_size
+            attrs['allowdEffects'] = v['allowed_effects']
+        if v['type'] == 'beacon':
+            attrs['distributionEffectivity'] = frac(v['distribution_effectivity'], float_conv_method = 'round')
+            attrs['supplyAreaDistance'] = frac(v['supply_area_distance'], float_conv_method = 'round')
+            attrs['__hash__'] = machine.Beacon.__hash__
+        if v['type'] == 'rocket-silo':
+            attrs['rocketPartsRequired'] = v['rocket_parts_required']
+        cls = type(clsName, bases, attrs)
+        if isCraftingMachine:
+            for c in v['crafting_categories']:
+                categoryMembers.setdefault(c, []).append(cls)
+            craftingMachines.append((cls, v['crafting_categories']))
         if 'fixed_recipe' in v:
             fixedRecipes.append((cls, v['fixed_recipe']))
-        if v['type'] == 'beacon':
-            cls.distributionEffectivity = frac(v['distribution_effectivity'], float_conv_method = 'round')
-            cls.supplyAreaDistance = frac(v['supply_area_distance'], float_conv_method = 'round')
-            cls.__hash__ = machine.Beacon.__hash__
         if v['type'] == 'rocket-silo':
-            cls.rocketPartsRequired = v['rocket_parts_required']
             rocketSilos.append(cls)
         mchByName[cls.name] = cls
         descr = v.get('translated_name','')
         if descr:
             translatedNames[f'mch {cls.name}'] = descr
 
+    # categories are immutable and store their members as a tuple, so they
+    # can only be created once all machines are known
+    for c, members in categoryMembers.items():
+        categories[c] = Category(c, tuple(members))
+    for cls, craftingCategories in craftingMachines:
+        cls.craftingCategories = {categories[c] for c in craftingCategories}
+
     # import modules
-    for k,v in gameInfo['items'].items():
+    for k,v in itemsInfo.items():
         if v['type'] != 'module': continue
-        pythonName = toPythonName(k)
         def get(what):
             return frac_from_float_round(v['module_effects'].get(what, {'bonus': 0})['bonus'], precision = 6)
         e = Effect(speed = get('speed'),
@@ -258,80 +274,82 @@ def _importGameInfo(gameInfo, includeDisabled, commonByproducts_, rocketRecipeHi
             limitation = None
         if limitation is not None:
             limitation = set(limitation)
-        item = Module(k, getOrderKey(v), v['stack_size'], e, limitation)
+        item = Module(intern(k), getOrderKey(v), v['stack_size'], e, limitation)
         addItem(item, v.get('translated_name',''))
 
+    # helpers for importing recipes
+    def toRecipeComponent(d, isProduct):
+        if 'amount' in d:
+            num = d['amount']*d.get('probability',1)
+        else:
+            num = d.get('probability',1) * (d['amount_max'] + d['amount_min']) / 2
+        if type(num) is float:
+            num = frac(num, float_conv_method = 'round')
+        if isProduct:
+            catalyst = d.get('catalyst_amount', 0)
+        else:
+            catalyst = 0
+        return RecipeComponent(item=lookupItem(d['name']), num = num, catalyst = catalyst)
+    def toRecipe(d):
+        inputs = tuple([toRecipeComponent(rc, False) for rc in d['ingredients']])
+        products = []
+        byproducts = []
+        for product in d['products']:
+            rc = toRecipeComponent(product, True)
+            if 'amount' in product:
+                amount = product['amount']
+            else:
+                amount = product['amount_max']
+            catalyst = rc.catalyst
+            if catalyst == 0:
+                for rc0 in inputs:
+                    if rc0.item == rc.item:
+                        catalyst = rc0.num
+            if amount - catalyst > 0:
+                products.append(rc)
+            else:
+                byproducts.append(rc)
+        if not products:
+            products = byproducts
+            byproducts = []
+        if len(products) > 1:
+            products_, byproducts_ = [], []
+            if 'main_product' in d:
+                for o in products:
+                    if o.item.name == d['main_product']['name']:
+                        products_.append(o)
+                    else:
+                        byproducts_.append(o)
+                assert(len(products_) == 1)
+            else:
+                for o in products:
+                    if o.item.name in commonByproducts:
+                        byproducts_.append(o)
+                    else:
+                        products_.append(o)
+                if len(products_) == 0:
+                    byproductNames = {rc.item.name for rc in byproducts_}
+                    newProducts = set()
+                    for o in byproducts_:
+                        name = o.item.name
+                        if byproductPriority[name] & byproductNames:
+                            newProducts |= byproductPriority[name] & byproductNames
+                    if len(newProducts) == 0:
+                        logger(f"{d['name']}: unable to determine main produce from byproducts {byproductNames}")
+                    else:
+                        products_ = [rc for rc in byproducts_ if rc.item.name in newProducts]
+                        byproducts_ = [rc for rc in byproducts_ if rc.item.name not in newProducts]
+            if len(products_) > 0:
+                products = products_
+                byproducts += byproducts_
+        time = frac(d.get('energy', 0.5), float_conv_method = 'round')
+        order = getOrderKey(d)
+        return Recipe(intern(d['name']),categories.get(d['category'], None),inputs,products,byproducts,time,order)
+
     # import recipes
     for (k,v) in gameInfo['recipes'].items():
         if not (includeDisabled or v.get('enabled', False)):
             continue
-        def toRecipeComponent(d, isProduct):
-            try:
-                num = d['amount']*d.get('probability',1)
-            except KeyError:
-                num = d.get('probability',1) * (d['amount_max'] + d['amount_min']) / 2
-            if type(num) is float:
-                num = frac(num, float_conv_method = 'round')
-            if isProduct:
-                catalyst = d.get('catalyst_amount', 0)
-            else:
-                catalyst = 0
-            return RecipeComponent(item=lookupItem(d['name']), num = num, catalyst = catalyst)
-        def toRecipe(d):
-            inputs = tuple(toRecipeComponent(rc, False) for rc in d['ingredients'])
-            products = []
-            byproducts = []
-            for product in d['products']:
-                rc = toRecipeComponent(product, True)
-                try:
-                    amount = product['amount']
-                except KeyError:
-                    amount = product['amount_max']
-                catalyst = rc.catalyst
-                if catalyst == 0:
-                    for rc0 in inputs:
-                        if rc0.item == rc.item:
-                            catalyst = rc0.num
-                if amount - catalyst > 0:
-                    products.append(rc)
-                else:
-                    byproducts.append(rc)
-            if not products:
-                products = byproducts
-                byproducts = []
-            if len(products) > 1:
-                products_, byproducts_ = [], []
-                if 'main_product' in d:
-                    for o in products:
-                        if o.item.name == d['main_product']['name']:
-                            products_.append(o)
-                        else:
-                            byproducts_.append(o)
-                    assert(len(products_) == 1)
-                else:
-                    for o in products:
-                        if o.item.name in commonByproducts:
-                            byproducts_.append(o)
-                        else:
-                            products_.append(o)
-                    if len(products_) == 0:
-                        byproductNames = {rc.item.name for rc in byproducts_}
-                        newProducts = set()
-                        for o in byproducts_:
-                            name = o.item.name
-                            if byproductPriority[name] & byproductNames:
-                                newProducts |= byproductPriority[name] & byproductNames
-                        if len(newProducts) == 0:
-                            logger(f"{d['name']}: unable to determine main produce from byproducts {byproductNames}")
-                        else:
-                            products_ = tuple(rc for rc in byproducts_ if rc.item.name in newProducts)
-                            byproducts_ = tuple(rc for rc in byproducts_ if rc.item.name not in newProducts)
-                if len(products_) > 0:
-                    products = products_
-                    byproducts += byproducts_
-            time = frac(d.get('energy', 0.5), float_conv_method = 'round')
-            order = getOrderKey(v)
-            return Recipe(v['name'],categories.get(v['category'], None),inputs,products,byproducts,time,order)
         recipe = toRecipe(v)
         addRecipe(recipe, v.get('translated_name', ''))
         if not v.get('enabled', False):
@@ -346,7 +364,7 @@ def _importGameInfo(gameInfo, includeDisabled, commonByproducts_, rocketRecipeHi
     rocketSiloDefaultProduct = {}
 
     # create recipes for rocket launch products
-    for k,v in gameInfo['items'].items():
+    for k,v in itemsInfo.items():
         rocket_launch_products = v.get('rocket_launch_products', None)
         if not rocket_launch_products: continue
         assert len(rocket_launch_products) == 1
@@ -369,7 +387,7 @@ def _importGameInfo(gameInfo, includeDisabled, commonByproducts_, rocketRecipeHi
             except AttributeError:
                 pass
             num = rocketSilo.rocketPartsRequired
-            rocket_parts_inputs = tuple(RecipeComponent(rc.num*num, 0, rc.item) for rc in recipe.inputs)
+            rocket_parts_inputs = tuple([RecipeComponent(rc.num*num, 0, rc.item) for rc in recipe.inputs])
             rocket_parts_time = recipe.time*num
             if useHint == '' or useHint == 'default-for-machine':
                 name = f'{item.name}--{rocketSilo.name}'
@@ -403,7 +421,7 @@ def _importGameInfo(gameInfo, includeDisabled, commonByproducts_, rocketRecipeHi
 
     steam = Recipe(
         name = 'steam',
-        category = Category('Boiler', [mchByName['boiler']]),
+        category = Category('Boiler', (mchByName['boiler'],)),
         inputs = (RecipeComponent(60, 0, lookupItem('water')),),
         products = (RecipeComponent(60, 0, lookupItem('steam')),),
         byproducts = (),
@@ -473,20 +491,24 @@ def vanillaResearchHacks(gi):
 
     def addResearch(name, order, inputs):
         order = ('z', 'z', order)
-        from . import helper
         item = addItem(Research, name, order)
         recipe = Recipe(name = name,
-                        category = Category('FakeLab', [FakeLab]),
-                        inputs = (RecipeComponent(1, 0, i) for i in sorted(inputs, key = lambda k: k.order)),
+                        category = Category('FakeLab', (FakeLab,)),
+                        inputs = [RecipeComponent(1, 0, i) for i in inputs],
                         products = (RecipeComponent(1, 0, item),),
                         byproducts = (),
                         time = 1,
                         order = order)
         addRecipe(recipe)
 
-    addResearch('_production_research', 'zz0', gi.presets['sciencePacks'] - {gi.itm.military_science_pack})
-    addResearch('_military_research', 'zz1', gi.presets['sciencePacks'] - {gi.itm.production_science_pack})
-    addResearch('_combined_research', 'zz2', gi.presets['sciencePacks'])
+    # inputs are expected to be in order
+    sciencePacks = sorted(gi.presets['sciencePacks'], key = lambda k: k.order)
+    def without(pack):
+        return [p for p in sciencePacks if p is not pack]
+
+    addResearch('_production_research', 'zz0', without(gi.itm.military_science_pack))
+    addResearch('_military_research', 'zz1', without(gi.itm.production_science_pack))
+    addResearch('_combined_research', 'zz2', sciencePacks)
 
 def vanillaCraftingHints():
     from . import rcpByName, itm
@@ -520,35 +542,41 @@ def _aliasPass(gi, nameTouchup = None):
         nameTouchup = lambda name: name
 
     conflicts = defaultdict(list)
+    symbols = {}
     for name,obj in gi.itmByName.items():
         alias = nameTouchup(name)
-        alias = toPythonName(alias)
+        alias = intern(toPythonName(alias))
         conflicts[f'itm.{alias}'].append(name)
-        setattr(gi.itm, alias,  obj)
+        symbols[alias] = obj
         gi.aliases[name] = alias
+    gi.itm.__dict__.update(symbols)
     conflicts = {k: v for k, v in conflicts.items() if len(v) > 1}
     if conflicts:
         raise AliasConflicts(conflicts)
 
     conflicts = defaultdict(list)
+    symbols = {}
     for name,obj in gi.rcpByName.items():
         alias = nameTouchup(name)
-        alias = toPythonName(alias)
+        alias = intern(toPythonName(alias))
         conflicts[f'rcp.{alias}'].append(name)
-        setattr(gi.rcp, alias, obj)
+        symbols[alias] = obj
         gi.aliases[name] = alias
+    gi.rcp.__dict__.update(symbols)
     conflicts = {k: v for k, v in conflicts.items() if len(v) > 1}
     if conflicts:
         raise AliasConflicts(conflicts)
 
     conflicts = defaultdict(list)
+    symbols = {}
     for name,cls in gi.mchByName.items():
         alias = nameTouchup(name)
-        alias = toClassName(alias)
+        alias = intern(toClassName(alias))
         conflicts[f'mch.{alias}'].append(name)
         cls.__name__ = alias
         cls.__qualname__ = alias
-        setattr(gi.mch, alias, cls)
+        symbols[alias] = cls
+    gi.mch.__dict__.update(symbols)
     conflicts = {k: v for k, v in conflicts.items() if len(v) > 1}
     if conflicts:
         raise AliasConflicts(conflicts)
@@ -660,8 +688,7 @@ def importGameInfo(gameInfo, *,
         rocketRecipeHints = {}
 
     if isinstance(gameInfo, Path):
-        with open(gameInfo) as f:
-            d = json.load(f)
+        d = _loadJson(gameInfo)
     else:
         d = gameInfo
 
@@ -0,0 +1,64 @@
+from factoriocalc import *
+from factoriocalc import blueprint
+from base64 import b64encode
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import json
+from pathlib import Path
+import tempfile
+import time
+import unittest
+import zlib
+
+def bp(label):
+    return {'blueprint': {'label': label, 'entities': []}}
+
+def book(*blueprints):
+    return {'blueprint_book': {'blueprints': list(blueprints)}}
+
+def encode(obj):
+    return '0' + b64encode(zlib.compress(json.dumps(obj).encode())).decode()
+
+class BlueprintBookTests(unittest.TestCase):
+    nested = BlueprintBook(book(bp('a'), book(bp('b'), book(), bp('c')), {'upgrade_planner': {}}, bp('d')))
+
+    def testLabels(self):
+        self.assertEqual(self.nested.labels(), ['a', 'b', 'c', 'd'])
+
+    def testFind(self):
+        for label in ('a', 'b', 'c', 'd'):
+            self.assertEqual(self.nested.find(label).raw['blueprint']['label'], label)
+        with self.assertRaises(KeyError):
+            self.nested.find('e')
+
+class ImportBlueprintTests(unittest.TestCase):
+    def testEmptyFile(self):
+        with tempfile.TemporaryDirectory() as d:
+            p = Path(d) / 'empty.txt'
+            p.touch()
+            with self.assertRaises(zlib.error):
+                importBlueprint(p)
+        with self.assertRaises(zlib.error):
+            importBlueprint('')
+
+    def testThreads(self):
+        # more distinct strings than the decompression cache holds, so that
+        # entries are evicted while other threads are reading them; the cache
+        # yields to other threads on lookup to make the interleaving likely
+        class YieldingDict(OrderedDict):
+            def get(self, key):
+                val = super().get(key)
+                time.sleep(0)
+                return val
+        labels = [f'bp{i}' for i in range(40)]
+        strs = [encode(bp(label)) for label in labels]
+        def run(_):
+            return [importBlueprint(s).raw['blueprint']['label'] for s in strs * 5]
+        saved = blueprint._decompressCache
+        blueprint._decompressCache = YieldingDict()
+        try:
+            with ThreadPoolExecutor(8) as ex:
+                for res in ex.map(run, range(8)):
+                    self.assertEqual(res, labels * 5)
+        finally:
+            blueprint._decompressCache = saved
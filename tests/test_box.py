@@ -0,0 +1,28 @@
+from factoriocalc import *
+import io
+import unittest
+
+class BoxStrTests(unittest.TestCase):
+    def setUp(self):
+        self.box = Box(Group(mch.AssemblingMachine1(rcp.iron_gear_wheel)),
+                       priorities = {itm.iron_plate: IGNORE, itm.iron_gear_wheel: 5})
+        # term valued constraints can not be created via __setitem__ so add
+        # one directly
+        dict.__setitem__(self.box.simpleConstraints, itm.iron_gear_wheel, (2, itm.iron_plate))
+        self.box.simpleConstraints[itm.iron_plate] = -1
+
+    def testSimpleConstraints(self):
+        self.assertEqual(str(self.box.simpleConstraints),
+                         'iron_gear_wheel = 2*iron_plate, iron_plate >= -1')
+
+    def testPriorities(self):
+        self.assertEqual(str(self.box.priorities),
+                         'ignore itm.iron_plate, itm.iron_gear_wheel: 5')
+
+    def testFooter(self):
+        # the box can not be solved with a term constraint, so test the part
+        # of the summary that lists the constraints directly
+        out = io.StringIO()
+        self.box._footer(out, '')
+        self.assertIn('Constraints: iron_gear_wheel = 2*iron_plate, iron_plate >= -1\n', out.getvalue())
+        self.assertIn('Priorities: ignore itm.iron_plate, itm.iron_gear_wheel: 5\n', out.getvalue())
@@ -0,0 +1,38 @@
+import factoriocalc
+from importlib import import_module
+from pathlib import Path
+import subprocess
+import sys
+import unittest
+
+class LazyModulesTests(unittest.TestCase):
+    def testSymbolsMatch(self):
+        for name, syms in factoriocalc._lazyModules.items():
+            mod = import_module(f'factoriocalc.{name}')
+            self.assertEqual(tuple(mod.__all__), syms)
+
+    def testAccess(self):
+        for name, syms in factoriocalc._lazyModules.items():
+            mod = getattr(factoriocalc, name)
+            for sym in syms:
+                self.assertIs(getattr(factoriocalc, sym), getattr(mod, sym))
+
+    def testDir(self):
+        names = dir(factoriocalc)
+        for name, syms in factoriocalc._lazyModules.items():
+            self.assertIn(name, names)
+            for sym in syms:
+                self.assertIn(sym, names)
+
+    def testFreshImport(self):
+        # run in a new interpreter so the lazy modules have not been loaded yet,
+        # from the directory containing the package under test so that it is
+        # the one imported
+        code = ('import sys, factoriocalc\n'
+                'names = dir(factoriocalc)\n'
+                'assert "importBlueprint" in names and "toJsonObj" in names, names\n'
+                'assert "factoriocalc.blueprint" not in sys.modules\n'
+                'from factoriocalc.blueprint import importBlueprint\n'
+                'assert factoriocalc.importBlueprint is importBlueprint\n')
+        subprocess.run([sys.executable, '-c', code], check = True,
+                       cwd = Path(factoriocalc.__file__).resolve().parents[1])